@@ -8,64 +8,154 @@
 
 from __future__ import annotations
 
-from typing import IO, TYPE_CHECKING, Union, Optional, List, Set, TypeVar, Iterable, Dict, Tuple
+from typing import IO, TYPE_CHECKING, Union, Optional, List, Set, TypeVar, Iterable, Iterator, Callable, Dict, Tuple, Deque, FrozenSet, Any
 
-from types import TracebackType
+from types import TracebackType, ModuleType
 import sys
 import os
 import struct
 import json
 import datetime
 import calendar
-from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED, ZIP_STORED
+import copy
+import io
+import errno
+import stat
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED, ZIP_STORED, ZIP64_LIMIT
 from shutil import copyfileobj
 from .internal_types import Jsonable, JsonableDict
 from .exceptions import Filter1PuxError
 
+orjson: Optional[ModuleType]
+try:
+  import orjson # type: ignore[import, no-redef]
+except ImportError:
+  orjson = None
+
+def json_loads(data: bytes) -> Any:
+  """Parses JSON text, using orjson if it is installed"""
+  if orjson is None:
+    return json.loads(data)
+  return orjson.loads(data)
+
+def json_dumps(content: Jsonable) -> bytes:
+  """Serializes to indented, key-sorted UTF-8 JSON text, using orjson if it is installed"""
+  if orjson is None:
+    return json.dumps(content, indent=2, sort_keys=True).encode('utf-8')
+  return orjson.dumps(content, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+
+# Layout of a zip local file header; see section 4.3.7 of the PKWARE APPNOTE.TXT
+LOCAL_FILE_HEADER_STRUCT = '<4s2B4HL2L2H'
+LOCAL_FILE_HEADER_SIZE = struct.calcsize(LOCAL_FILE_HEADER_STRUCT)
+LOCAL_FILE_HEADER_SIGNATURE = b'PK\003\004'
+LOCAL_FILE_HEADER_FILENAME_LENGTH_INDEX = 10
+LOCAL_FILE_HEADER_EXTRA_LENGTH_INDEX = 11
+
+ZIP_CENTRAL_DIRECTORY_HEADER_SIZE = 46
+ZIP_END_RECORD_SIZE = 22
+
+ZIP_FLAG_ENCRYPTED = 0x0001
+ZIP_FLAG_DATA_DESCRIPTOR = 0x0008
+
+def real_file_fileno(file: object) -> Optional[int]:
+  """Returns the OS file descriptor of a file object whose descriptor holds exactly its bytes.
+
+  Wrappers such as gzip.GzipFile also have a fileno(), but it is the descriptor of the
+  underlying compressed file, so only plain FileIO objects and buffered wrappers around
+  them qualify.
+  """
+  raw = file.raw if isinstance(file, (io.BufferedReader, io.BufferedWriter, io.BufferedRandom)) else file
+  if not isinstance(raw, io.FileIO) or raw.closed:
+    return None
+  return raw.fileno()
+
+def may_contain_document_ids(json_text: bytes) -> bool:
+  """Returns False if raw JSON text certainly contains no "documentId" keys.
+
+  This is a single C-level substring search, far cheaper than walking the parsed tree.
+  """
+  return b'"documentId"' in json_text
+
 if TYPE_CHECKING:
   from _typeshed import StrPath, Self
   from zipfile import _ZipFileMode
 
 class OnePasswordItemData:
+  __slots__ = ('_data', '_item_uuid', '_document_ids')
+
   _data: JsonableDict
-  _document_ids: Set[str]
+  _item_uuid: str
+  _document_ids: Optional[Set[str]]
 
-  def __init__(self, data: JsonableDict):
+  def __init__(self, data: JsonableDict, scan_document_ids: bool = True):
+    # The item tree is not walked for document IDs until they are needed. If
+    # scan_document_ids is False, the caller knows there are no document IDs to collect.
     self._data = data
-    self._document_ids = set()
-    self._add_all_document_ids(self._data)
+    item_uuid = data['uuid']
+    assert isinstance(item_uuid, str)
+    self._item_uuid = item_uuid
+    self._document_ids = None if scan_document_ids else set()
 
   @property
   def item_uuid(self) -> str:
-    return self._data['uuid']
+    return self._item_uuid
 
   @property
   def document_ids(self) -> Set[str]:
+    if self._document_ids is None:
+      self._document_ids = set()
+      self._add_all_document_ids(self._data, self._document_ids)
     return self._document_ids
 
   @property
   def raw_data(self) -> JsonableDict:
     return self._data
 
-  def _add_all_document_ids(self, subtree: JsonableDict | List[Jsonable]) -> None:
-    if isinstance(subtree, list):
-      for v in subtree:
-        if isinstance(v, (dict, list)):
-          self._add_all_document_ids(v)
-    elif isinstance(subtree, dict):
-      for k, v in subtree.items():
-        if isinstance(v, (dict, list)):
-          self._add_all_document_ids(v)
-        elif k == 'documentId' and isinstance(v, str):
-          self._document_ids.add(v)
+  def add_document_ids_to(self, document_ids: Set[str]) -> None:
+    # Adds this item's document IDs to a caller's set (typically the containing vault's),
+    # walking the item tree directly into it if the per-item set has not been built.
+    if self._document_ids is None:
+      self._add_all_document_ids(self._data, document_ids)
+    else:
+      document_ids.update(self._document_ids)
+
+  def _add_all_document_ids(self, subtree: JsonableDict | List[Jsonable], document_ids: Set[str]) -> None:
+    # Walks the tree with an explicit stack rather than recursion, so deeply nested
+    # items cannot hit the recursion limit. JSON parsers only produce exact dicts and
+    # lists, so exact type checks are used in place of isinstance. mypy cannot narrow
+    # through those checks, so the stack holds Any.
+    stack: List[Any] = [subtree]
+    while len(stack) > 0:
+      node = stack.pop()
+      if type(node) is dict:
+        for k, v in node.items():
+          tv = type(v)
+          if tv is dict or tv is list:
+            stack.append(v)
+          # str == already tries identity and then length in C before comparing contents,
+          # and the literal is interned, so a Python-level "is"/len() guard would only add work
+          elif k == 'documentId' and tv is str:
+            document_ids.add(v)
+      else:
+        for v in node:
+          tv = type(v)
+          if tv is dict or tv is list:
+            stack.append(v)
 
 class OnePasswordVaultData:
+  __slots__ = ('_data', '_attrs', '_vault_uuid', '_vault_name', '_items', '_items_by_uuid', '_document_ids')
+
   _data: JsonableDict
+  _attrs: JsonableDict
+  _vault_uuid: str
+  _vault_name: str
   _items: List[OnePasswordItemData]
   _items_by_uuid: Dict[str, OnePasswordItemData]
-  _document_ids: Set[str]
+  _document_ids: Optional[Set[str]]
 
-  def __init__(self, data: JsonableDict):
+  def __init__(self, data: JsonableDict, scan_document_ids: bool = True):
     self._data = data
     if not 'attrs' in data:
       raise Filter1PuxError('1Password archive vault is missing "attrs" property')
@@ -75,16 +165,20 @@ class OnePasswordVaultData:
       raise Filter1PuxError('1Password archive vault is missing "items" property')
     if not isinstance(data['items'], list):
       raise Filter1PuxError('1Password archive vault "items" property is not a list')
+    attrs = data['attrs']
+    self._attrs = attrs
+    self._vault_uuid = attrs['uuid']
+    self._vault_name = attrs['name']
     self._items = []
     self._items_by_uuid = {}
-    self._document_ids = set()
+    self._document_ids = None
+    set_item_by_uuid = self._items_by_uuid.setdefault
+    append_item = self._items.append
     for item_raw_data in data['items']:
-      item_data = OnePasswordItemData(item_raw_data)
-      if item_data.item_uuid in self._items_by_uuid:
-        raise Filter1PuxError(f'Multiple instances of item uuid {item_data.item_uuid} in vault "{self.vault_name}"')
-      self._items.append(item_data)
-      self._items_by_uuid[item_data.item_uuid] = item_data
-      self._document_ids.update(item_data.document_ids)
+      item_data = OnePasswordItemData(item_raw_data, scan_document_ids=scan_document_ids)
+      if set_item_by_uuid(item_data.item_uuid, item_data) is not item_data:
+        raise Filter1PuxError(f'Multiple instances of item uuid {item_data.item_uuid} in vault "{self._vault_name}"')
+      append_item(item_data)
 
   @property
   def raw_data(self) -> JsonableDict:
@@ -92,13 +186,11 @@ class OnePasswordVaultData:
 
   @property
   def vault_attrs(self) -> JsonableDict:
-    result = self._data['attrs']
-    assert isinstance(result, dict)
-    return result
+    return self._attrs
 
   @property
   def vault_uuid(self) -> str:
-    return self.vault_attrs['uuid']
+    return self._vault_uuid
 
   @property
   def vault_description(self) -> str:
@@ -110,7 +202,7 @@ class OnePasswordVaultData:
 
   @property
   def vault_name(self) -> str:
-    return self.vault_attrs['name']
+    return self._vault_name
 
   @property
   def vault_type(self) -> str:
@@ -126,6 +218,11 @@ class OnePasswordVaultData:
 
   @property
   def document_ids(self) -> Set[str]:
+    if self._document_ids is None:
+      document_ids: Set[str] = set()
+      for item_data in self._items:
+        item_data.add_document_ids_to(document_ids)
+      self._document_ids = document_ids
     return self._document_ids
 
   @property
@@ -133,18 +230,42 @@ class OnePasswordVaultData:
     return len(self.vault_item_list)
 
 class OnePasswordAccountData:
+  __slots__ = (
+      '_unfiltered_data',
+      '_attrs',
+      '_account_uuid',
+      '_account_name',
+      '_unfiltered_vaults',
+      '_unfiltered_vaults_by_uuid',
+      '_unfiltered_vaults_by_name',
+      '_unfiltered_document_ids',
+      '_filtered_data',
+      '_filtered_vaults',
+      '_filtered_vaults_by_uuid',
+      '_filtered_vaults_by_name',
+      '_filtered_document_ids',
+    )
+
   _unfiltered_data: JsonableDict
+  _attrs: JsonableDict
+  _account_uuid: str
+  _account_name: str
   _unfiltered_vaults: List[OnePasswordVaultData]
   _unfiltered_vaults_by_uuid: Dict[str, OnePasswordVaultData]
   _unfiltered_vaults_by_name: Dict[str, OnePasswordVaultData]
-  _unfiltered_document_ids: Set[str]
+  _unfiltered_document_ids: Optional[Set[str]]
   _filtered_data: JsonableDict
   _filtered_vaults: List[OnePasswordVaultData]
   _filtered_vaults_by_uuid: Dict[str, OnePasswordVaultData]
   _filtered_vaults_by_name: Dict[str, OnePasswordVaultData]
-  _filtered_document_ids: Set[str]
+  _filtered_document_ids: Optional[Set[str]]
 
-  def __init__(self, data: JsonableDict, include_vault_names: Optional[Iterable[Optional[str]]] = None):
+  def __init__(
+        self,
+        data: JsonableDict,
+        include_vault_names: Optional[Iterable[Optional[str]]] = None,
+        scan_document_ids: bool = True,
+      ):
     self._unfiltered_data = data
     if not 'attrs' in data:
       raise Filter1PuxError('1Password archive account is missing "attrs" property')
@@ -154,42 +275,41 @@ class OnePasswordAccountData:
       raise Filter1PuxError('1Password archive account is missing "vaults" property')
     if not isinstance(data['vaults'], list):
       raise Filter1PuxError('1Password archive account "vaults" property is not a list')
+    attrs = data['attrs']
+    self._attrs = attrs
+    self._account_uuid = attrs['uuid']
+    self._account_name = attrs['accountName']
     self._unfiltered_vaults = []
     self._unfiltered_vaults_by_uuid = {}
     self._unfiltered_vaults_by_name = {}
-    self._unfiltered_document_ids = set()
-    vault_name_set: Set[Optional[str]] = set([None]) if include_vault_names is None else set(include_vault_names)
+    self._unfiltered_document_ids = None
+    self._filtered_document_ids = None
+    vault_name_set: FrozenSet[Optional[str]] = (
+        frozenset([None]) if include_vault_names is None else frozenset(include_vault_names)
+      )
     include_all_vaults = None in vault_name_set
     if include_all_vaults:
       self._filtered_vaults = self._unfiltered_vaults
       self._filtered_vaults_by_uuid = self._unfiltered_vaults_by_uuid
       self._filtered_vaults_by_name = self._unfiltered_vaults_by_name
-      self._filtered_document_ids = self._unfiltered_document_ids
     else:
       self._filtered_vaults = []
       self._filtered_vaults_by_uuid = {}
       self._filtered_vaults_by_name = {}
-      self._filtered_document_ids = set()
 
     for vault_raw_data in data['vaults']:
-      vault = OnePasswordVaultData(vault_raw_data)
-      if vault.vault_uuid in self._unfiltered_vaults_by_uuid:
+      vault = OnePasswordVaultData(vault_raw_data, scan_document_ids=scan_document_ids)
+      if self._unfiltered_vaults_by_uuid.setdefault(vault.vault_uuid, vault) is not vault:
         raise Filter1PuxError(f'Multiple instances of vault uuid {vault.vault_uuid} in account "{self.account_name}"')
-      if vault.vault_name in self._unfiltered_vaults_by_name:
+      if self._unfiltered_vaults_by_name.setdefault(vault.vault_name, vault) is not vault:
         raise Filter1PuxError(f'Multiple instances of vault name "{vault.vault_name}" in account "{self.account_name}"')
       self._unfiltered_vaults.append(vault)
-      self._unfiltered_vaults_by_uuid[vault.vault_uuid] = vault
-      self._unfiltered_vaults_by_name[vault.vault_name] = vault
-      self._unfiltered_document_ids.update(vault.document_ids)
-      if not include_all_vaults and (
-            vault.vault_uuid in vault_name_set or
-            vault.vault_name in vault_name_set
-          ):
+      if not include_all_vaults and not vault_name_set.isdisjoint((vault.vault_uuid, vault.vault_name)):
         self._filtered_vaults.append(vault)
         self._filtered_vaults_by_uuid[vault.vault_uuid] = vault
         self._filtered_vaults_by_name[vault.vault_name] = vault
-        self._filtered_document_ids.update(vault.document_ids)
-    if include_all_vaults:
+    if include_all_vaults or len(self._filtered_vaults) == len(self._unfiltered_vaults):
+      # No vaults were filtered out, so the raw data can be shared
       self._filtered_data = self._unfiltered_data
     else:
       self._filtered_data = dict(self._unfiltered_data)
@@ -208,17 +328,15 @@ class OnePasswordAccountData:
 
   @property
   def account_attrs(self) -> JsonableDict:
-    result = self._unfiltered_data['attrs']
-    assert isinstance(result, dict)
-    return result
+    return self._attrs
 
   @property
   def account_uuid(self) -> str:
-    return self.account_attrs['uuid']
+    return self._account_uuid
 
   @property
   def account_name(self) -> str:
-    return self.account_attrs['accountName']
+    return self._account_name
 
   @property
   def account_domain(self) -> str:
@@ -250,6 +368,8 @@ class OnePasswordAccountData:
 
   @property
   def unfiltered_document_ids(self) -> Set[str]:
+    if self._unfiltered_document_ids is None:
+      self._unfiltered_document_ids = set().union(*(vault.document_ids for vault in self._unfiltered_vaults))
     return self._unfiltered_document_ids
 
   @property
@@ -266,6 +386,12 @@ class OnePasswordAccountData:
 
   @property
   def filtered_document_ids(self) -> Set[str]:
+    # Only the included vaults are walked, unless nothing was filtered out
+    if self._filtered_document_ids is None:
+      if self._filtered_data is self._unfiltered_data:
+        self._filtered_document_ids = self.unfiltered_document_ids
+      else:
+        self._filtered_document_ids = set().union(*(vault.document_ids for vault in self._filtered_vaults))
     return self._filtered_document_ids
 
   @property
@@ -277,26 +403,32 @@ class OnePasswordAccountData:
     return len(self.filtered_vault_list)
 
 class OnePasswordArchive:
-  BUFFER_SIZE: int = 1024 * 1024 * 2
+  BUFFER_SIZE: int = 1024 * 1024 * 8
+  READ_AHEAD_MAX_FILE_SIZE: int = 1024 * 1024
+  READ_AHEAD_BUFFER_SIZE: int = 1024 * 1024 * 32
 
   _zf: ZipFile
+  _name_to_zi: Dict[str, ZipInfo]
+  _src_fd: Optional[int] = None
   _export_attributes: Optional[JsonableDict] = None
   _export_attributes_zipinfo: Optional[ZipInfo] = None
   _unfiltered_data: Optional[JsonableDict] = None
+  _export_data_may_contain_document_ids: bool = True
   _filtered_data: Optional[JsonableDict] = None
   _unfiltered_zipinfos: Optional[List[ZipInfo]] = None
   _filtered_zipinfos: Optional[List[ZipInfo]] = None
   _export_data_zipinfo: Optional[ZipInfo] = None
   _files_dir_zipinfo: Optional[ZipInfo] = None
   _file_document_ids: Optional[Set[str]] = None
+  _zipinfo_document_ids: Optional[List[Tuple[ZipInfo, str]]] = None
   _unfiltered_accounts: List[OnePasswordAccountData]
   _unfiltered_accounts_by_uuid: Dict[str, OnePasswordAccountData]
   _unfiltered_accounts_by_name: Dict[str, OnePasswordAccountData]
-  _unfiltered_document_ids: Set[str]
+  _unfiltered_document_ids: Optional[Set[str]] = None
   _filtered_accounts: List[OnePasswordAccountData]
   _filtered_accounts_by_uuid: Dict[str, OnePasswordAccountData]
   _filtered_accounts_by_name: Dict[str, OnePasswordAccountData]
-  _filtered_document_ids: Set[str]
+  _filtered_document_ids: Optional[Set[str]] = None
 
   def __init__(
         self,
@@ -306,15 +438,16 @@ class OnePasswordArchive:
       ):
     self._zf = ZipFile(file, mode=mode)
     self._zf.debug = 0
+    self._name_to_zi = {zi.filename: zi for zi in self._zf.infolist()}
+    if hasattr(os, 'pread'):
+      self._src_fd = real_file_fileno(self._zf.fp)
     account_vault_names: Dict[Optional[str], Set[Optional[str]]] = {}
     def add_account_vault_name(account_name: Optional[str], vault_name: Optional[str]) -> None:
       if account_name == '*':
         account_name = None
       if vault_name == '*':
         vault_name = None
-      if not account_name in account_vault_names:
-        account_vault_names[account_name] = set()
-      account_vault_names[account_name].add(vault_name)
+      account_vault_names.setdefault(account_name, set()).add(vault_name)
 
     if not include_vault_names is None:
       for include_vault_name in include_vault_names:
@@ -329,37 +462,41 @@ class OnePasswordArchive:
     self._unfiltered_accounts = []
     self._unfiltered_accounts_by_uuid = {}
     self._unfiltered_accounts_by_name = {}
-    self._unfiltered_document_ids = set()
     self._filtered_accounts = []
     self._filtered_accounts_by_uuid = {}
     self._filtered_accounts_by_name = {}
-    self._filtered_document_ids = set()
 
     data = self.get_unfiltered_data()
+    # Loop-invariant values and bound methods are hoisted out of the per-account loop
+    no_include_vault_names = include_vault_names is None
+    scan_document_ids = self._export_data_may_contain_document_ids
+    get_account_vault_names = account_vault_names.get
+    set_unfiltered_account_by_name = self._unfiltered_accounts_by_name.setdefault
+    set_unfiltered_account_by_uuid = self._unfiltered_accounts_by_uuid.setdefault
+    append_unfiltered_account = self._unfiltered_accounts.append
+    append_filtered_account = self._filtered_accounts.append
+    filtered_accounts_by_uuid = self._filtered_accounts_by_uuid
+    filtered_accounts_by_name = self._filtered_accounts_by_name
     for account_data in data['accounts']:
       account_attrs = account_data['attrs']
       account_name = account_attrs['name']
-      if account_name in self._unfiltered_accounts_by_name:
-        raise Filter1PuxError(f"Multiple 1Password accounts with name '{account_name}'")
       account_uuid = account_attrs['uuid']
-      if account_uuid in self._unfiltered_accounts_by_uuid:
-        raise Filter1PuxError(f"Multiple 1Password accounts with UUID '{account_uuid}'")
-      by_account_name_vault_names = account_vault_names.get(account_name, None)
-      by_account_uuid_vault_names = account_vault_names.get(account_uuid, None)
+      by_account_name_vault_names = get_account_vault_names(account_name, None)
+      by_account_uuid_vault_names = get_account_vault_names(account_uuid, None)
       include_account = (
           include_all_accounts or
-          not by_account_name_vault_names is None or
-          not by_account_uuid_vault_names is None
+          by_account_name_vault_names is not None or
+          by_account_uuid_vault_names is not None
         )
       vault_names: Set[Optional[str]] = set()
       if include_account:
-        if include_vault_names is None:
+        if no_include_vault_names:
           vault_names.add(None)
-        if not wild_account_vault_names is None:
+        if wild_account_vault_names is not None:
           vault_names.update(wild_account_vault_names)
-        if not by_account_name_vault_names is None:
+        if by_account_name_vault_names is not None:
           vault_names.update(by_account_name_vault_names)
-        if not by_account_uuid_vault_names is None:
+        if by_account_uuid_vault_names is not None:
           vault_names.update(by_account_uuid_vault_names)
         if (
               by_account_name_vault_names is None and
@@ -367,23 +504,30 @@ class OnePasswordArchive:
               wild_account_vault_names is None
             ):
           vault_names.add(None)
-      account = OnePasswordAccountData(account_data, include_vault_names=vault_names)
-      self._unfiltered_accounts.append(account)
-      self._unfiltered_accounts_by_uuid[account_uuid] = account
-      self._unfiltered_accounts_by_name[account_name] = account
-      self._unfiltered_document_ids.update(account.unfiltered_document_ids)
+      account = OnePasswordAccountData(
+          account_data,
+          include_vault_names=vault_names,
+          scan_document_ids=scan_document_ids,
+        )
+      if set_unfiltered_account_by_name(account_name, account) is not account:
+        raise Filter1PuxError(f"Multiple 1Password accounts with name '{account_name}'")
+      if set_unfiltered_account_by_uuid(account_uuid, account) is not account:
+        raise Filter1PuxError(f"Multiple 1Password accounts with UUID '{account_uuid}'")
+      append_unfiltered_account(account)
       if include_account:
-        self._filtered_accounts.append(account)
-        self._filtered_accounts_by_uuid[account_uuid] = account
-        self._filtered_accounts_by_name[account_name] = account
-        self._filtered_document_ids.update(account.filtered_document_ids)
+        append_filtered_account(account)
+        filtered_accounts_by_uuid[account_uuid] = account
+        filtered_accounts_by_name[account_name] = account
     
-    missing_file_document_ids = self._unfiltered_document_ids - self.file_document_ids
+    # Only the included vaults' items are walked for document IDs, so files are checked against
+    # those. Unreferenced files can only be identified when nothing was filtered out.
+    missing_file_document_ids = self.filtered_document_ids - self.file_document_ids
     if len(missing_file_document_ids) > 0:
       print(f"WARNING: Document IDs {missing_file_document_ids} have no corresponding files in archive", file=sys.stderr)
-    extra_file_document_ids = self.file_document_ids - self._unfiltered_document_ids
-    if len(extra_file_document_ids) > 0:
-      print(f"NOTE: Document IDs {extra_file_document_ids} have files but no item references; they will be ignored", file=sys.stderr)
+    if self.get_filtered_data() is self.get_unfiltered_data():
+      extra_file_document_ids = self.file_document_ids - self.filtered_document_ids
+      if len(extra_file_document_ids) > 0:
+        print(f"NOTE: Document IDs {extra_file_document_ids} have files but no item references; they will be ignored", file=sys.stderr)
 
   def __enter__(self) -> Self:
     return self
@@ -397,6 +541,7 @@ class OnePasswordArchive:
     self.close()
 
   def close(self) -> None:
+    self._src_fd = None
     self._zf.close()
 
   @property
@@ -407,101 +552,116 @@ class OnePasswordArchive:
   def export_attributes(self) -> JsonableDict:
     if self._export_attributes is None:
       with self._zf.open('export.attributes') as f:
-        self._export_attributes = json.load(f)
+        self._export_attributes = json_loads(f.read())
     return self._export_attributes
 
   @property
   def export_attributes_zipinfo(self) -> ZipInfo:
     if self._export_attributes_zipinfo is None:
-      self._export_attributes_zipinfo = self._zf.getinfo('export.attributes')
+      self._export_attributes_zipinfo = self._name_to_zi['export.attributes']
     return self._export_attributes_zipinfo
 
   def get_unfiltered_data(self) -> JsonableDict:
     if self._unfiltered_data is None:
       with self._zf.open('export.data') as f:
-        self._unfiltered_data = json.load(f)
+        json_text = f.read()
+      self._export_data_may_contain_document_ids = may_contain_document_ids(json_text)
+      self._unfiltered_data = json_loads(json_text)
     return self._unfiltered_data
 
   def get_filtered_data(self) -> JsonableDict:
     if self._filtered_data is None:
-      result = dict(self.get_unfiltered_data())
-      accounts_data: List[JsonableDict] = []
-      for account in self.filtered_accounts:
-        accounts_data.append(account.filtered_raw_account_data)
-      result['accounts'] = accounts_data
-      self._filtered_data = result
+      unfiltered_data = self.get_unfiltered_data()
+      if (
+            len(self._filtered_accounts) == len(self._unfiltered_accounts) and
+            all(a.filtered_raw_account_data is a.unfiltered_raw_account_data for a in self._filtered_accounts)
+          ):
+        # Nothing was filtered out, so the raw data can be shared
+        self._filtered_data = unfiltered_data
+      else:
+        result = dict(unfiltered_data)
+        accounts_data: List[JsonableDict] = []
+        for account in self.filtered_accounts:
+          accounts_data.append(account.filtered_raw_account_data)
+        result['accounts'] = accounts_data
+        self._filtered_data = result
     return self._filtered_data
 
   @property
   def export_data_zipinfo(self) -> ZipInfo:
     if self._export_data_zipinfo is None:
-      self._export_data_zipinfo = self._zf.getinfo('export.data')
+      self._export_data_zipinfo = self._name_to_zi['export.data']
     return self._export_data_zipinfo
 
   @property
   def files_dir_zipinfo(self) -> ZipInfo:
     if self._files_dir_zipinfo is None:
-      try:
-        self._files_dir_zipinfo = self._zf.getinfo('files/')
-      except KeyError:
-        self._files_dir_zipinfo = self.new_zipinfo(
+      files_dir_zipinfo = self._name_to_zi.get('files/', None)
+      if files_dir_zipinfo is None:
+        files_dir_zipinfo = self.new_zipinfo(
             'files/',
             mode_bits=0o755,
             is_dir=True,
           )
+      self._files_dir_zipinfo = files_dir_zipinfo
     return self._files_dir_zipinfo
 
+  def _scan_zip(self) -> None:
+    # Makes a single pass over the archive's directory, producing the document file
+    # zipinfos, the set of document IDs that have files, and the document ID of each file.
+    unfiltered_zipinfos: List[ZipInfo] = []
+    file_document_ids: Set[str] = set()
+    zipinfo_document_ids: List[Tuple[ZipInfo, str]] = []
+    seen_filenames: Set[str] = set()
+    for zi in self._zf.infolist():
+      filename = zi.filename
+      if filename in seen_filenames:
+        print(f"WARNING: Document file '{filename}' appears multiple times in archive", file=sys.stderr)
+      seen_filenames.add(filename)
+      if not filename in ('export.attributes', 'export.data', 'files/'):
+        if filename.startswith('files/'):
+          unfiltered_zipinfos.append(zi)
+          document_id = self.filename_to_document_id(filename)
+          if document_id in file_document_ids:
+            print(f"WARNING: Document ID '{document_id}' associated with multiple files in archive", file=sys.stderr)
+          file_document_ids.add(document_id)
+          zipinfo_document_ids.append((zi, document_id))
+        else:
+          print(f"NOTE: 1Password archive contains unexpected file {filename}; it will be ignored", file=sys.stderr)
+    self._unfiltered_zipinfos = unfiltered_zipinfos
+    self._file_document_ids = file_document_ids
+    self._zipinfo_document_ids = zipinfo_document_ids
+
   @property
   def unfiltered_zipinfos(self) -> List[ZipInfo]:
     if self._unfiltered_zipinfos is None:
-      result: List[ZipInfo] = []
-      seen_filenames: Set[str] = set()
-      for zi in self._zf.infolist():
-        filename = zi.filename
-        if filename in seen_filenames:
-          print(f"WARNING: Document file '{filename}' appears multiple times in archive", file=sys.stderr)
-        seen_filenames.add(filename)
-        if not filename in ('export.attributes', 'export.data', 'files/'):
-          if filename.startswith('files/'):
-            result.append(zi)
-          else:
-            print(f"NOTE: 1Password archive contains unexpected file {filename}; it will be ignored", file=sys.stderr)
-      self._unfiltered_zipinfos = result
+      self._scan_zip()
+      assert not self._unfiltered_zipinfos is None
     return self._unfiltered_zipinfos
 
   @classmethod
   def filename_to_document_id(cls, filename: str) -> str:
     assert filename.startswith('files/')
-    if '_' in filename:
-      eoid = filename.index('_')
-    else:
-      eoid = len(filename)
-    document_id = filename[6:eoid]
-    return document_id
+    eoid = filename.find('_', 6)
+    return filename[6:] if eoid < 0 else filename[6:eoid]
 
   @property
   def filtered_zipinfos(self) -> List[ZipInfo]:
     if self._filtered_zipinfos is None:
-      result: List[ZipInfo] = []
-      for zi in self.unfiltered_zipinfos:
-        filename = zi.filename
-        document_id = self.filename_to_document_id(filename)
-        if document_id in self.filtered_document_ids:
-          result.append(zi)
-      self._filtered_zipinfos = result
+      if self._zipinfo_document_ids is None:
+        self._scan_zip()
+        assert not self._zipinfo_document_ids is None
+      filtered_document_ids = self.filtered_document_ids
+      self._filtered_zipinfos = [
+          zi for zi, document_id in self._zipinfo_document_ids if document_id in filtered_document_ids
+        ]
     return self._filtered_zipinfos
 
   @property
   def file_document_ids(self) -> Set[str]:
     if self._file_document_ids is None:
-      result: Set[str] = set()
-      for zi in self.unfiltered_zipinfos:
-        filename = zi.filename
-        document_id = self.filename_to_document_id(filename)
-        if document_id in result:
-          print(f"WARNING: Document ID '{document_id}' associated with multiple files in archive", file=sys.stderr)
-        result.add(document_id)
-      self._file_document_ids = result
+      self._scan_zip()
+      assert not self._file_document_ids is None
     return self._file_document_ids
 
   @property
@@ -518,6 +678,10 @@ class OnePasswordArchive:
 
   @property
   def unfiltered_document_ids(self) -> Set[str]:
+    if self._unfiltered_document_ids is None:
+      self._unfiltered_document_ids = set().union(
+          *(account.unfiltered_document_ids for account in self._unfiltered_accounts)
+        )
     return self._unfiltered_document_ids
 
   @property
@@ -534,6 +698,10 @@ class OnePasswordArchive:
 
   @property
   def filtered_document_ids(self) -> Set[str]:
+    if self._filtered_document_ids is None:
+      self._filtered_document_ids = set().union(
+          *(account.filtered_document_ids for account in self._filtered_accounts)
+        )
     return self._filtered_document_ids
 
   def copy_archive_file(
@@ -541,10 +709,183 @@ class OnePasswordArchive:
         dest_archive: ZipFile,
         filename: str | ZipInfo,
       ) -> None:
-    zi = filename if isinstance(filename, ZipInfo) else self._zf.getinfo(filename)
-    with self._zf.open(zi, mode='r') as fin:
-      with dest_archive.open(zi, mode='w') as fout:
-        copyfileobj(fin, fout, self.BUFFER_SIZE)
+    zi = filename if isinstance(filename, ZipInfo) else self._name_to_zi[filename]
+    if self.can_copy_archive_file_raw(zi):
+      self.copy_archive_file_raw(dest_archive, zi)
+    else:
+      with self._zf.open(zi, mode='r') as fin:
+        with dest_archive.open(zi, mode='w') as fout:
+          copyfileobj(fin, fout, self.BUFFER_SIZE)
+
+  @classmethod
+  def can_copy_archive_file_raw(cls, zi: ZipInfo) -> bool:
+    return (
+        (zi.flag_bits & ZIP_FLAG_ENCRYPTED) == 0 and
+        zi.file_size < ZIP64_LIMIT and
+        zi.compress_size < ZIP64_LIMIT
+      )
+
+  def copy_archive_file_raw(
+        self,
+        dest_archive: ZipFile,
+        zi: ZipInfo,
+      ) -> None:
+    # Copies the member's compressed bytes verbatim, so it is neither decompressed nor
+    # recompressed. Where both archives are regular files on Linux, the bytes are copied
+    # in the kernel with os.sendfile.
+    data_offset = self._raw_archive_file_data_offset(zi)
+    write_data: Callable[[IO[bytes]], object]
+    if self._can_sendfile(dest_archive):
+      write_data = lambda dest_fp: self._sendfile_raw_archive_file_data(dest_fp, data_offset, zi)
+    else:
+      write_data = lambda dest_fp: self._copy_raw_archive_file_data(dest_fp, data_offset, zi)
+    self._write_raw_archive_file(dest_archive, zi, write_data)
+
+  def _read_source_archive(self, offset: int, size: int) -> bytes:
+    # Positional read from the source archive that is safe to call from multiple threads.
+    # os.pread leaves the descriptor's file position alone; file objects without a
+    # descriptor are read under the source ZipFile's own lock.
+    if not self._src_fd is None:
+      return os.pread(self._src_fd, size, offset)
+    with self._zf._lock:  # type: ignore[attr-defined]
+      src_fp = self._zf.fp
+      if src_fp is None:
+        raise ValueError("Attempt to use ZIP archive that was already closed")
+      src_fp.seek(offset)
+      return src_fp.read(size)
+
+  def _raw_archive_file_data_offset(self, zi: ZipInfo) -> int:
+    fheader = self._read_source_archive(zi.header_offset, LOCAL_FILE_HEADER_SIZE)
+    if len(fheader) != LOCAL_FILE_HEADER_SIZE or fheader[:4] != LOCAL_FILE_HEADER_SIGNATURE:
+      raise Filter1PuxError(f"1Password archive file '{zi.filename}' has a bad local file header")
+    fheader_fields = struct.unpack(LOCAL_FILE_HEADER_STRUCT, fheader)
+    return (
+        zi.header_offset + LOCAL_FILE_HEADER_SIZE +
+        fheader_fields[LOCAL_FILE_HEADER_FILENAME_LENGTH_INDEX] +
+        fheader_fields[LOCAL_FILE_HEADER_EXTRA_LENGTH_INDEX]
+      )
+
+  def _iter_raw_archive_file_data(self, data_offset: int, zi: ZipInfo) -> Iterator[bytes]:
+    remaining = zi.compress_size
+    while remaining > 0:
+      buf = self._read_source_archive(data_offset, min(remaining, self.BUFFER_SIZE))
+      if len(buf) == 0:
+        raise Filter1PuxError(f"1Password archive file '{zi.filename}' is truncated")
+      yield buf
+      data_offset += len(buf)
+      remaining -= len(buf)
+
+  def _copy_raw_archive_file_data(self, dest_fp: IO[bytes], data_offset: int, zi: ZipInfo) -> None:
+    for buf in self._iter_raw_archive_file_data(data_offset, zi):
+      dest_fp.write(buf)
+
+  def _can_sendfile(self, dest_archive: ZipFile) -> bool:
+    # Linux is the only platform where sendfile accepts a regular file as the destination
+    if self._src_fd is None or not sys.platform.startswith('linux') or not hasattr(os, 'sendfile'):
+      return False
+    if not dest_archive._seekable:  # type: ignore[attr-defined]
+      return False
+    return not real_file_fileno(dest_archive.fp) is None
+
+  def _sendfile_raw_archive_file_data(
+        self,
+        dest_fp: IO[bytes],
+        src_offset: int,
+        zi: ZipInfo,
+      ) -> None:
+    # The destination's buffer is flushed and its OS-level file position set explicitly
+    # before handing the descriptors to the kernel, and the file object is re-seeked
+    # afterwards so its cached position is correct.
+    assert not self._src_fd is None
+    dest_fp.flush()
+    dest_offset = dest_fp.tell()
+    dest_fd = dest_fp.fileno()
+    os.lseek(dest_fd, dest_offset, os.SEEK_SET)
+    remaining = zi.compress_size
+    while remaining > 0:
+      n = os.sendfile(dest_fd, self._src_fd, src_offset, remaining)
+      if n == 0:
+        raise Filter1PuxError(f"1Password archive file '{zi.filename}' is truncated")
+      src_offset += n
+      remaining -= n
+    dest_fp.seek(dest_offset + zi.compress_size)
+
+  def _write_raw_archive_file(
+        self,
+        dest_archive: ZipFile,
+        zi: ZipInfo,
+        write_data: Callable[[IO[bytes]], object],
+      ) -> None:
+    # ZipFile has no public API for adding already-compressed data, so the destination
+    # is updated the same way ZipFile.writestr does internally.
+    dest_zi = copy.copy(zi)
+    # The CRC and sizes are already known, so they go in the local header rather
+    # than in a trailing data descriptor
+    dest_zi.flag_bits &= ~ZIP_FLAG_DATA_DESCRIPTOR
+    with dest_archive._lock:  # type: ignore[attr-defined]
+      if dest_archive._writing:  # type: ignore[attr-defined]
+        raise ValueError("Can't write to ZIP archive while an open writing handle exists")
+      dest_archive._writecheck(dest_zi)  # type: ignore[attr-defined]
+      dest_fp = dest_archive.fp
+      assert not dest_fp is None
+      dest_archive._didModify = True  # type: ignore[attr-defined]
+      if dest_archive._seekable:  # type: ignore[attr-defined]
+        dest_fp.seek(dest_archive.start_dir)
+      dest_zi.header_offset = dest_fp.tell()
+      dest_fp.write(dest_zi.FileHeader())
+      write_data(dest_fp)
+      dest_archive.start_dir = dest_fp.tell()
+      dest_archive.filelist.append(dest_zi)
+      dest_archive.NameToInfo[dest_zi.filename] = dest_zi
+
+  def copy_archive_files(
+        self,
+        dest_archive: ZipFile,
+        zipinfos: Iterable[ZipInfo],
+        max_workers: Optional[int] = None,
+      ) -> None:
+    # Small members are read ahead by a pool of threads while the calling thread writes
+    # them to dest_archive in order. Read-ahead is limited to members of at most
+    # READ_AHEAD_MAX_FILE_SIZE and READ_AHEAD_BUFFER_SIZE bytes in flight; larger members
+    # are streamed directly.
+    zipinfos = list(zipinfos)
+    if max_workers is None:
+      max_workers = os.cpu_count() or 1
+    if max_workers <= 1 or len(zipinfos) <= 1:
+      for zi in zipinfos:
+        self.copy_archive_file(dest_archive, zi)
+      return
+
+    def is_prefetchable(zi: ZipInfo) -> bool:
+      return self.can_copy_archive_file_raw(zi) and zi.compress_size <= self.READ_AHEAD_MAX_FILE_SIZE
+
+    def read_raw(zi: ZipInfo) -> bytes:
+      return b''.join(self._iter_raw_archive_file_data(self._raw_archive_file_data_offset(zi), zi))
+
+    prefetch_zipinfos = [zi for zi in zipinfos if is_prefetchable(zi)]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+      window: Deque[Tuple[int, Future[bytes]]] = deque()
+      window_size = 0
+      next_prefetch = 0
+      def fill_window() -> None:
+        nonlocal window_size, next_prefetch
+        while next_prefetch < len(prefetch_zipinfos) and len(window) < max_workers * 2:
+          zi = prefetch_zipinfos[next_prefetch]
+          if len(window) > 0 and window_size + zi.compress_size > self.READ_AHEAD_BUFFER_SIZE:
+            break
+          window.append((zi.compress_size, executor.submit(read_raw, zi)))
+          window_size += zi.compress_size
+          next_prefetch += 1
+      fill_window()
+      for zi in zipinfos:
+        if is_prefetchable(zi):
+          size, future = window.popleft()
+          window_size -= size
+          data = future.result()
+          fill_window()
+          self._write_raw_archive_file(dest_archive, zi, lambda dest_fp: dest_fp.write(data))
+        else:
+          self.copy_archive_file(dest_archive, zi)
 
   def write_archive_json_file(
         self,
@@ -556,12 +897,12 @@ class OnePasswordArchive:
     zi: ZipInfo
     if isinstance(filename, ZipInfo):
       zi = filename
-    elif copy_zipinfo and filename in self._zf.namelist():
-      zi = self._zf.getinfo(filename)
+    elif copy_zipinfo and filename in self._name_to_zi:
+      zi = self._name_to_zi[filename]
     else:
       zi = self.new_zipinfo(filename)
     with dest_archive.open(zi, mode='w') as fout:
-      fout.write(json.dumps(content, indent=2, sort_keys=True).encode('utf-8'))
+      fout.write(json_dumps(content))
 
   def write_archive_empty_file(
         self,
@@ -572,8 +913,8 @@ class OnePasswordArchive:
     zi: ZipFile
     if isinstance(filename, ZipInfo):
       zi = filename
-    elif copy_zipinfo and filename in self._zf.namelist():
-      zi = self._zf.getinfo(filename)
+    elif copy_zipinfo and filename in self._name_to_zi:
+      zi = self._name_to_zi[filename]
     else:
       zi = self.new_zipinfo(filename)
     with dest_archive.open(zi, mode='w') as fout:
@@ -591,8 +932,8 @@ class OnePasswordArchive:
     else:
       if not dirname.endswith('/'):
         dirname += '/'
-      if copy_zipinfo and dirname in self._zf.namelist():
-        zi = self._zf.getinfo(dirname)
+      if copy_zipinfo and dirname in self._name_to_zi:
+        zi = self._name_to_zi[dirname]
       else:
         zi = self.new_zipinfo(dirname, is_dir=True)
     with dest_archive.open(zi, mode='w') as fout:
@@ -603,15 +944,74 @@ class OnePasswordArchive:
         file: StrPath | IO[bytes]
       ) -> None:
 
+    owned_file: Optional[IO[bytes]] = None
+    created_filename: Optional[str] = None
     if isinstance(file, str):
-      file = open(os.open(file, os.O_CREAT | os.O_WRONLY, 0o600), 'wb')    
-    with ZipFile(file, mode='x') as zf:
-      zf.debug = 0
-      self.copy_archive_file(zf, self.export_attributes_zipinfo)
-      self.write_archive_json_file(zf, self.export_data_zipinfo, self.get_filtered_data())
-      self.write_archive_directory(zf, self.files_dir_zipinfo)
-      for zi in self.filtered_zipinfos:
-        self.copy_archive_file(zf, zi)
+      if not os.path.exists(file):
+        created_filename = file
+      owned_file = open(os.open(file, os.O_CREAT | os.O_WRONLY, 0o600), 'wb')
+      file = owned_file
+    completed = False
+    try:
+      # Preallocation and truncation only apply to regular files; a device such as
+      # /dev/null or a named pipe rejects them
+      is_regular_file = not owned_file is None and stat.S_ISREG(os.fstat(owned_file.fileno()).st_mode)
+      if not owned_file is None and is_regular_file:
+        self.preallocate_file(owned_file, self.estimate_filtered_archive_size())
+      with ZipFile(file, mode='x') as zf:
+        zf.debug = 0
+        self.copy_archive_file(zf, self.export_attributes_zipinfo)
+        filtered_data = self.get_filtered_data()
+        if filtered_data is self.get_unfiltered_data():
+          # Nothing was filtered out, so the original export.data can be copied as-is
+          self.copy_archive_file(zf, self.export_data_zipinfo)
+        else:
+          self.write_archive_json_file(zf, self.export_data_zipinfo, filtered_data)
+        self.write_archive_directory(zf, self.files_dir_zipinfo)
+        self.copy_archive_files(zf, self.filtered_zipinfos)
+      if not owned_file is None and is_regular_file:
+        # Drop any preallocated space beyond the end of the archive
+        owned_file.truncate()
+      completed = True
+    finally:
+      if not owned_file is None:
+        owned_file.close()
+        if not completed and not created_filename is None:
+          # Don't leave a partial archive behind in a file this method created
+          os.unlink(created_filename)
+
+  def estimate_filtered_archive_size(self) -> int:
+    # Local header, data and central directory entry for each member, plus the end record.
+    # The size of export.data is taken from the source archive, so this is only an estimate
+    # when vaults are filtered out. A ZipInfo made by new_zipinfo has no compress_size
+    # attribute on Python versions before 3.9.
+    zipinfos: List[ZipInfo] = [
+        self.export_attributes_zipinfo,
+        self.export_data_zipinfo,
+        self.files_dir_zipinfo,
+      ]
+    zipinfos.extend(self.filtered_zipinfos)
+    result = ZIP_END_RECORD_SIZE
+    for zi in zipinfos:
+      name_extra_size = len(zi.filename.encode('utf-8')) + len(zi.extra)
+      result += (
+          LOCAL_FILE_HEADER_SIZE + ZIP_CENTRAL_DIRECTORY_HEADER_SIZE + 2 * name_extra_size +
+          len(zi.comment) + getattr(zi, 'compress_size', 0)
+        )
+    return result
+
+  @classmethod
+  def preallocate_file(cls, file: IO[bytes], size: int) -> None:
+    # Reserves disk space up front so a large archive is written into contiguous extents
+    # and a full disk is detected before any copying. This is only a hint; platforms and
+    # filesystems that do not support it are silently skipped.
+    if not hasattr(os, 'posix_fallocate') or size <= 0:
+      return
+    try:
+      os.posix_fallocate(file.fileno(), 0, size)
+    except OSError as e:
+      if e.errno == errno.ENOSPC:
+        raise
 
   @classmethod
   def new_zipinfo(
@@ -629,9 +1029,10 @@ class OnePasswordArchive:
     result = ZipInfo()
 
     # Specify UTF-8 filename if it includes any extended characters
-    if any(ord(c) >= 128 for c in filename):
+    if not filename.isascii():
       result.flag_bits |= 0x0800
-    result.filename = filename.encode('utf-8')
+    # ZipInfo.filename is a str; zipfile does the UTF-8 encoding when it writes headers
+    result.filename = filename
     if not mod_time is None:
       result.date_time = mod_time.utctimetuple()[:6]
       posix_timestamp = int(calendar.timegm(mod_time.utctimetuple()))
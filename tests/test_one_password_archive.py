@@ -0,0 +1,237 @@
+import errno
+import gzip
+import io
+import json
+import os
+import tempfile
+import threading
+import zipfile
+from typing import IO, Dict, Union
+
+import pytest
+
+from filter_1pux import OnePasswordArchive
+
+EXPORT_DATA = {
+    "accounts": [
+        {
+          "attrs": {"name": "Acct1", "accountName": "a1", "uuid": "AU1", "domain": "d", "email": "e", "avatar": ""},
+          "vaults": [
+              {
+                "attrs": {"uuid": "V1", "name": "Personal", "avatar": "", "type": "P"},
+                "items": [
+                    {"uuid": "I1", "details": {"documentAttributes": {"documentId": "doc1"}}},
+                    {"uuid": "I2", "sections": [{"fields": [{"value": {"file": {"documentId": "doc2"}}}]}]},
+                  ],
+              },
+              {
+                "attrs": {"uuid": "V2", "name": "Work", "avatar": "", "type": "U"},
+                "items": [
+                    {"uuid": "I3", "details": {"documentAttributes": {"documentId": "doc3"}}},
+                    {"uuid": "I4"},
+                  ],
+              },
+            ],
+        },
+      ],
+  }
+
+DOCUMENT_FILES: Dict[str, int] = {
+    'files/doc1__photo.jpg': zipfile.ZIP_STORED,
+    'files/doc2__notes.txt': zipfile.ZIP_DEFLATED,
+    'files/doc3__scan.pdf': zipfile.ZIP_DEFLATED,
+  }
+
+def document_content(filename: str) -> bytes:
+  return (filename.encode('utf-8') + b'\n') * 5000
+
+def write_test_archive(
+      file: Union[str, IO[bytes]],
+      include_files_dir: bool = True,
+      document_files: Dict[str, int] = DOCUMENT_FILES,
+    ) -> None:
+  with zipfile.ZipFile(file, 'w') as zf:
+    zf.writestr('export.attributes', json.dumps({"version": 3}), compress_type=zipfile.ZIP_DEFLATED)
+    zf.writestr('export.data', json.dumps(EXPORT_DATA), compress_type=zipfile.ZIP_DEFLATED)
+    if include_files_dir:
+      zf.writestr(zipfile.ZipInfo('files/'), b'')
+    for filename, compress_type in document_files.items():
+      zf.writestr(filename, document_content(filename), compress_type=compress_type)
+
+def read_members(file: IO[bytes]) -> Dict[str, bytes]:
+  with zipfile.ZipFile(file) as zf:
+    assert zf.testzip() is None
+    return {zi.filename: zf.read(zi) for zi in zf.infolist()}
+
+def copy_all_documents(archive: OnePasswordArchive, max_workers: int) -> Dict[str, bytes]:
+  result = io.BytesIO()
+  with zipfile.ZipFile(result, mode='x') as zf:
+    archive.copy_archive_files(zf, archive.unfiltered_zipinfos, max_workers=max_workers)
+  result.seek(0)
+  return read_members(result)
+
+def test_copy_archive_files_from_file_object_source():
+  with tempfile.TemporaryFile() as src:
+    write_test_archive(src)
+    src.seek(0)
+    archive = OnePasswordArchive(src)
+    members = copy_all_documents(archive, max_workers=4)
+    assert members == {filename: document_content(filename) for filename in DOCUMENT_FILES}
+    # The caller's file must still be usable by the source archive
+    assert archive.zip_file.testzip() is None
+    archive.close()
+
+def test_copy_archive_files_from_nameless_stream_source():
+  src = io.BytesIO()
+  write_test_archive(src)
+  src.seek(0)
+  with OnePasswordArchive(src) as archive:
+    members = copy_all_documents(archive, max_workers=4)
+  assert members == {filename: document_content(filename) for filename in DOCUMENT_FILES}
+
+def test_copy_archive_files_from_gzip_source(tmp_path):
+  # A GzipFile has a fileno(), but it is the descriptor of the compressed file
+  src = str(tmp_path / 'src.1pux.gz')
+  archive_bytes = io.BytesIO()
+  write_test_archive(archive_bytes)
+  with gzip.open(src, 'wb') as f:
+    f.write(archive_bytes.getvalue())
+  with gzip.open(src, 'rb') as f:
+    archive = OnePasswordArchive(f)
+    members = copy_all_documents(archive, max_workers=4)
+    assert members == {filename: document_content(filename) for filename in DOCUMENT_FILES}
+    archive.close()
+    with pytest.raises(ValueError):
+      copy_all_documents(archive, max_workers=1)
+
+def test_copy_archive_files_to_gzip_dest(tmp_path):
+  # Member data must not be sent straight to the descriptor of the compressed file
+  src = str(tmp_path / 'src.1pux')
+  dest = str(tmp_path / 'dest.1pux.gz')
+  write_test_archive(src)
+  with OnePasswordArchive(src) as archive:
+    with gzip.open(dest, 'wb') as f:
+      with zipfile.ZipFile(f, mode='w') as zf:
+        archive.copy_archive_files(zf, archive.unfiltered_zipinfos)
+  with gzip.open(dest, 'rb') as f:
+    members = read_members(io.BytesIO(f.read()))
+  assert members == {filename: document_content(filename) for filename in DOCUMENT_FILES}
+
+def test_write_filtered_archive_cleans_up_when_preallocation_fails(tmp_path, monkeypatch):
+  src = str(tmp_path / 'src.1pux')
+  dest = str(tmp_path / 'dest.1pux')
+  write_test_archive(src)
+  def posix_fallocate(fd: int, offset: int, size: int) -> None:
+    raise OSError(errno.ENOSPC, 'No space left on device')
+  monkeypatch.setattr(os, 'posix_fallocate', posix_fallocate, raising=False)
+  with OnePasswordArchive(src) as archive:
+    with pytest.raises(OSError):
+      archive.write_filtered_archive(dest)
+  assert not os.path.exists(dest)
+
+def test_write_filtered_archive_to_dev_null(tmp_path):
+  src = str(tmp_path / 'src.1pux')
+  write_test_archive(src)
+  with OnePasswordArchive(src) as archive:
+    archive.write_filtered_archive(os.devnull)
+
+@pytest.mark.skipif(not os.path.isdir('/proc/self/fd'), reason='requires /proc/self/fd')
+def test_write_filtered_archive_to_pipe(tmp_path):
+  src = str(tmp_path / 'src.1pux')
+  write_test_archive(src)
+  read_fd, write_fd = os.pipe()
+  received = io.BytesIO()
+  def drain() -> None:
+    with open(read_fd, 'rb') as f:
+      received.write(f.read())
+  reader = threading.Thread(target=drain)
+  reader.start()
+  try:
+    with OnePasswordArchive(src) as archive:
+      archive.write_filtered_archive(f'/proc/self/fd/{write_fd}')
+  finally:
+    os.close(write_fd)
+    reader.join()
+  received.seek(0)
+  members = read_members(received)
+  for filename in DOCUMENT_FILES:
+    assert members[filename] == document_content(filename)
+
+def write_filtered(tmp_path, include_vault_names=None) -> Dict[str, bytes]:
+  src = str(tmp_path / 'src.1pux')
+  dest = str(tmp_path / 'dest.1pux')
+  write_test_archive(src)
+  with OnePasswordArchive(src, include_vault_names=include_vault_names) as archive:
+    archive.write_filtered_archive(dest)
+  with zipfile.ZipFile(src) as src_zf, zipfile.ZipFile(dest) as dest_zf:
+    for dest_zi in dest_zf.infolist():
+      src_zi = src_zf.getinfo(dest_zi.filename)
+      if dest_zi.filename != 'export.data' or include_vault_names is None:
+        # Members, and export.data when nothing is filtered out, are copied without recompression
+        assert dest_zi.compress_type == src_zi.compress_type
+        assert dest_zi.compress_size == src_zi.compress_size
+        assert dest_zi.CRC == src_zi.CRC
+      else:
+        # Filtered export.data is re-serialized as indented JSON
+        assert dest_zi.CRC != src_zi.CRC
+        assert dest_zf.read(dest_zi).startswith(b'{\n  "accounts"')
+  with open(dest, 'rb') as f:
+    return read_members(f)
+
+def test_write_filtered_archive_unfiltered(tmp_path):
+  members = write_filtered(tmp_path)
+  assert sorted(members) == sorted(['export.attributes', 'export.data', 'files/'] + list(DOCUMENT_FILES))
+  assert json.loads(members['export.data']) == EXPORT_DATA
+  for filename in DOCUMENT_FILES:
+    assert members[filename] == document_content(filename)
+
+def test_write_filtered_archive_with_vault_filter(tmp_path):
+  members = write_filtered(tmp_path, include_vault_names=['Personal'])
+  expected_files = ['files/doc1__photo.jpg', 'files/doc2__notes.txt']
+  assert sorted(members) == sorted(['export.attributes', 'export.data', 'files/'] + expected_files)
+  vaults = json.loads(members['export.data'])['accounts'][0]['vaults']
+  assert [vault['attrs']['name'] for vault in vaults] == ['Personal']
+  for filename in expected_files:
+    assert members[filename] == document_content(filename)
+
+def test_write_filtered_archive_without_files_dir_entry(tmp_path):
+  # The files/ directory entry is synthesized when the source archive has none
+  src = str(tmp_path / 'src.1pux')
+  dest = str(tmp_path / 'dest.1pux')
+  write_test_archive(src, include_files_dir=False)
+  with OnePasswordArchive(src) as archive:
+    archive.write_filtered_archive(dest)
+  with open(dest, 'rb') as f:
+    members = read_members(f)
+  assert sorted(members) == sorted(['export.attributes', 'export.data', 'files/'] + list(DOCUMENT_FILES))
+  with zipfile.ZipFile(dest) as zf:
+    assert zf.getinfo('files/').is_dir()
+
+def test_copy_archive_files_parallel_matches_serial(tmp_path):
+  src = str(tmp_path / 'src.1pux')
+  write_test_archive(src)
+  with OnePasswordArchive(src) as archive:
+    assert copy_all_documents(archive, max_workers=4) == copy_all_documents(archive, max_workers=1)
+
+@pytest.mark.parametrize('include_vault_names, expect_warning, expect_note', [
+    (None, True, True),
+    (['Personal'], False, False),
+    (['Work'], True, False),
+  ])
+def test_load_reports_missing_and_unreferenced_files(tmp_path, capsys, include_vault_names, expect_warning, expect_note):
+  # doc3 is referenced by the Work vault but has no file; doc9 has a file but no item references it.
+  # Unreferenced files are only reported when nothing is filtered out.
+  src = str(tmp_path / 'src.1pux')
+  document_files = dict(DOCUMENT_FILES)
+  del document_files['files/doc3__scan.pdf']
+  document_files['files/doc9__orphan.bin'] = zipfile.ZIP_STORED
+  write_test_archive(src, document_files=document_files)
+  with OnePasswordArchive(src, include_vault_names=include_vault_names) as archive:
+    err = capsys.readouterr().err
+    assert ('WARNING' in err and 'doc3' in err) == expect_warning
+    assert ('NOTE' in err and 'doc9' in err) == expect_note
+    if not include_vault_names is None:
+      # Excluded vaults' item trees are never walked for document IDs
+      for vault in archive.unfiltered_accounts[0].unfiltered_vault_list:
+        if not vault.vault_name in include_vault_names:
+          assert vault._document_ids is None